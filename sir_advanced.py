@@ -4,29 +4,109 @@ Auteur: Foovi Komivi
 Date: 2020-02-15
 """
 
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import odeint
-import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:  # numba optionnel : repli sur odeint
+    njit = None
+
+# Affichage interactif des figures (SIR_SHOW=1) ; sinon elles sont seulement
+# sauvegardées, ce qui évite de bloquer les exécutions en lot
+AFFICHER_GRAPHIQUES = os.environ.get('SIR_SHOW', '0') == '1'
 
 # -------------------------------
 # Fonctions du modèle SIR
 # -------------------------------
 
 def sir_equations(y, t, N, beta, gamma):
-    """Équations du modèle SIR"""
+    """
+    Équations du modèle SIR
+
+    Vectorisées sur l'axe 0 : y peut être de forme (3,) ou (3, k),
+    avec beta scalaire ou de forme (k,).
+    """
     S, I, R = y
-    dSdt = -beta * S * I / N
-    dIdt = beta * S * I / N - gamma * I
-    dRdt = gamma * I
-    return dSdt, dIdt, dRdt
+    inf = beta * S * I / N  # nouvelles infections, calculées une seule fois
+    return -inf, inf - gamma * I, gamma * I
+
+def sir_jacobien(y, t, N, beta, gamma):
+    """Jacobienne analytique des équations SIR (évite les différences finies de LSODA)"""
+    S, I, R = y
+    return [[-beta * I / N, -beta * S / N, 0.0],
+            [beta * I / N, beta * S / N - gamma, 0.0],
+            [0.0, gamma, 0.0]]
+
+# Pas interne maximal du RK4 (jours) pour un taux de 0.5 jour⁻¹ ; il est réduit
+# proportionnellement au plus grand des taux β, γ pour garder la précision d'odeint
+PAS_RK4 = 0.25
+
+def _rk4_sir(N, beta, gamma, S0, I0, R0, t, n_sous_pas):
+    """Intègre le modèle SIR par RK4 à pas fixe sur une grille uniforme"""
+    out = np.empty((t.size, 3))
+    S, I, R = S0, I0, R0
+    out[0, 0], out[0, 1], out[0, 2] = S, I, R
+    h = (t[1] - t[0]) / n_sous_pas
+    c = beta / N
+    for k in range(1, t.size):
+        for _ in range(n_sous_pas):
+            inf1 = c * S * I
+            k1S, k1I = -inf1, inf1 - gamma * I
+            S2, I2 = S + 0.5 * h * k1S, I + 0.5 * h * k1I
+            inf2 = c * S2 * I2
+            k2S, k2I = -inf2, inf2 - gamma * I2
+            S3, I3 = S + 0.5 * h * k2S, I + 0.5 * h * k2I
+            inf3 = c * S3 * I3
+            k3S, k3I = -inf3, inf3 - gamma * I3
+            S4, I4 = S + h * k3S, I + h * k3I
+            inf4 = c * S4 * I4
+            k4S, k4I = -inf4, inf4 - gamma * I4
+            S += h / 6.0 * (k1S + 2.0 * k2S + 2.0 * k3S + k4S)
+            I += h / 6.0 * (k1I + 2.0 * k2I + 2.0 * k3I + k4I)
+        R = R0 + (S0 - S) + (I0 - I)  # conservation : dR = -(dS + dI)
+        out[k, 0], out[k, 1], out[k, 2] = S, I, R
+    return out
+
+if njit is not None:
+    _rk4_sir = njit(fastmath=True, cache=True)(_rk4_sir)
+
+def _grille_uniforme(temps):
+    """Vrai si la grille de temps est uniforme (condition du RK4 à pas fixe)"""
+    if temps.size < 2:
+        return False
+    pas = np.diff(temps)
+    return np.allclose(pas, pas[0])
 
 def simuler_sir(N, beta, gamma, S0, I0, R0, temps):
-    """Simule le modèle SIR"""
+    """Simule le modèle SIR (RK4 compilé par numba si disponible, sinon odeint)"""
+    temps = np.asarray(temps, dtype=np.float64)
+    if njit is not None and _grille_uniforme(temps):
+        pas_max = PAS_RK4 * 0.5 / max(beta, gamma, 0.5)
+        n_sous_pas = max(1, int(np.ceil((temps[1] - temps[0]) / pas_max)))
+        solution = _rk4_sir(float(N), float(beta), float(gamma),
+                            float(S0), float(I0), float(R0), temps, n_sous_pas)
+        return solution.T
     y0 = [S0, I0, R0]
-    solution = odeint(sir_equations, y0, temps, args=(N, beta, gamma))
+    solution = odeint(sir_equations, y0, temps, args=(N, beta, gamma),
+                      Dfun=sir_jacobien)
     return solution.T  # retourne S, I, R
 
+def simuler_sir_lot(N, betas, gamma, S0, I0, R0, temps):
+    """
+    Simule le modèle SIR pour plusieurs valeurs de β partageant la même grille
+
+    Retourne S, I, R : arrays de forme (K, len(temps)), une ligne par β
+    """
+    betas = np.asarray(betas, dtype=np.float64)
+    solutions = np.empty((3, betas.size, len(temps)))
+    for k, beta in enumerate(betas):
+        solutions[:, k] = simuler_sir(N, beta, gamma, S0, I0, R0, temps)
+    return solutions  # retourne S, I, R
+
 # -------------------------------
 # Analyse de sensibilité R0
 # -------------------------------
@@ -35,18 +115,20 @@ def analyse_sensibilite_R0():
     N = 10000
     S0, I0, R0_init = 9990, 10, 0
     gamma = 0.1
-    temps = np.linspace(0, 200, 200)
+    temps = np.arange(0, 200+1, dtype=np.float64)  # pas d'un jour, comme les scénarios
     
     valeurs_R0 = [0.5, 1.0, 1.5, 2.0, 3.0, 5.0]
     
+    # Toutes les valeurs de β résolues par simuler_sir_lot
+    betas = np.array(valeurs_R0) * gamma
+    S, I, R = simuler_sir_lot(N, betas, gamma, S0, I0, R0_init, temps)
+    
     plt.figure(figsize=(14,6))
     
     # Courbes des infectés pour différents R0
     plt.subplot(1,2,1)
-    for R0_val in valeurs_R0:
-        beta = R0_val * gamma
-        S, I, R = simuler_sir(N, beta, gamma, S0, I0, R0_init, temps)
-        plt.plot(temps, I, linewidth=2, label=f'R₀={R0_val}')
+    for R0_val, I_k in zip(valeurs_R0, I):
+        plt.plot(temps, I_k, linewidth=2, label=f'R₀={R0_val}')
     
     plt.xlabel('Temps (jours)', fontsize=12)
     plt.ylabel('Nombre d\'infectés', fontsize=12)
@@ -56,11 +138,7 @@ def analyse_sensibilite_R0():
     
     # Barres : attaque finale
     plt.subplot(1,2,2)
-    attaque_finale = []
-    for R0_val in valeurs_R0:
-        beta = R0_val * gamma
-        S, I, R = simuler_sir(N, beta, gamma, S0, I0, R0_init, temps)
-        attaque_finale.append((N - S[-1]) / N * 100)
+    attaque_finale = (N - S[:, -1]) / N * 100
     
     plt.bar([str(r) for r in valeurs_R0], attaque_finale, color='coral', edgecolor='black')
     plt.xlabel('R₀', fontsize=12)
@@ -69,9 +147,10 @@ def analyse_sensibilite_R0():
     plt.grid(True, alpha=0.3, axis='y')
     
     plt.tight_layout()
-    plt.savefig('analyse_sensibilite_R0.png', dpi=300)
+    plt.savefig('analyse_sensibilite_R0.png', dpi=150)
     print("Graphique sauvegardé : analyse_sensibilite_R0.png")
-    plt.show()
+    if AFFICHER_GRAPHIQUES:
+        plt.show()
 
 # -------------------------------
 # Scénarios d'interventions
@@ -83,7 +162,7 @@ def scenarios_interventions():
     gamma = 0.1
     beta_base = 0.5
     jours_total = 200
-    temps = np.arange(0, jours_total+1)
+    temps = np.arange(0, jours_total+1, dtype=np.float64)
     
     scenarios = {
         'Sans intervention': (beta_base, 0),
@@ -92,25 +171,37 @@ def scenarios_interventions():
         'Confinement (-80%)': (beta_base*0.2, 30)
     }
     
-    plt.figure(figsize=(14,6))
+    # Trajectoire sans intervention (β de base) : sa portion avant jour_intervention
+    # sert aussi de phase avant intervention, elle n'est intégrée qu'une fois
+    S_base, I_base, R_base = simuler_sir(N, beta_base, gamma, S0, I0, R0_init, temps)
+    
+    # Une seule figure : courbes en haut, tableau récapitulatif en bas
+    fig = plt.figure(figsize=(14,9))
+    gs = fig.add_gridspec(2, 1, height_ratios=[3, 1])
+    plt.subplot(gs[0])
+    colonnes = ['Scénario', 'Pic d\'infectés', 'Total infectés', 'Pourcentage']
     resultats = []
     
     for nom, (beta, jour_intervention) in scenarios.items():
         if jour_intervention == 0:
-            S, I, R = simuler_sir(N, beta, gamma, S0, I0, R0_init, temps)
+            if beta == beta_base:
+                S, I, R = S_base, I_base, R_base
+            else:
+                S, I, R = simuler_sir(N, beta, gamma, S0, I0, R0_init, temps)
         else:
-            # Avant intervention
-            temps1 = np.arange(0, jour_intervention+1)
-            S1, I1, R1 = simuler_sir(N, beta_base, gamma, S0, I0, R0_init, temps1)
+            # Indice du premier point de la grille au jour d'intervention ou après
+            j = int(np.searchsorted(temps, jour_intervention))
             
-            # Après intervention
-            temps2 = np.arange(jour_intervention, jours_total+1)
-            S2, I2, R2 = simuler_sir(N, beta, gamma, S1[-1], I1[-1], R1[-1], temps2)
+            # Après intervention, depuis l'état de la phase de base à temps[j]
+            temps2 = temps[j:]
+            S2, I2, R2 = simuler_sir(N, beta, gamma, S_base[j], I_base[j], R_base[j], temps2)
             
-            # Combiner les résultats
-            S = np.concatenate([S1[:-1], S2])
-            I = np.concatenate([I1[:-1], I2])
-            R = np.concatenate([R1[:-1], R2])
+            # Combiner les résultats dans des tableaux préalloués
+            S = np.empty_like(temps)
+            I = np.empty_like(S)
+            R = np.empty_like(S)
+            S[:j], I[:j], R[:j] = S_base[:j], I_base[:j], R_base[:j]
+            S[j:], I[j:], R[j:] = S2, I2, R2
         
         # Tracer la courbe des infectés
         plt.plot(temps, I, linewidth=2, label=nom)
@@ -118,12 +209,8 @@ def scenarios_interventions():
         # Statistiques
         pic = np.max(I)
         total_infectes = N - S[-1]
-        resultats.append({
-            'Scénario': nom,
-            'Pic d\'infectés': int(pic),
-            'Total infectés': int(total_infectes),
-            'Pourcentage': f"{total_infectes/N*100:.1f}%"
-        })
+        resultats.append([nom, int(pic), int(total_infectes),
+                          f"{total_infectes/N*100:.1f}%"])
     
     plt.xlabel('Temps (jours)', fontsize=12)
     plt.ylabel('Nombre d\'infectés', fontsize=12)
@@ -132,10 +219,9 @@ def scenarios_interventions():
     plt.grid(True, alpha=0.3)
     
     # Tableau récapitulatif
-    plt.figure(figsize=(8,2))
+    plt.subplot(gs[1])
     plt.axis('off')
-    df = pd.DataFrame(resultats)
-    table = plt.table(cellText=df.values, colLabels=df.columns,
+    table = plt.table(cellText=resultats, colLabels=colonnes,
                       cellLoc='center', loc='center', bbox=[0,0,1,1])
     table.auto_set_font_size(False)
     table.set_fontsize(10)
@@ -143,12 +229,16 @@ def scenarios_interventions():
     plt.title('Résultats des Scénarios', fontsize=14, fontweight='bold', pad=20)
     
     plt.tight_layout()
-    plt.savefig('scenarios_interventions.png', dpi=300)
+    plt.savefig('scenarios_interventions.png', dpi=150)
     print("Graphique sauvegardé : scenarios_interventions.png")
-    plt.show()
+    if AFFICHER_GRAPHIQUES:
+        plt.show()
     
     print("\n TABLEAU RÉCAPITULATIF DES SCÉNARIOS")
-    print(df.to_string(index=False))
+    largeurs = [max(len(str(ligne[k])) for ligne in [colonnes] + resultats)
+                for k in range(len(colonnes))]
+    for ligne in [colonnes] + resultats:
+        print("  ".join(str(v).rjust(l) for v, l in zip(ligne, largeurs)))
 
 # -------------------------------
 # Fonction principale
@@ -4,10 +4,33 @@ Auteur: Foovi Komivi
 Date: 2020-02-15
 """
 
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import odeint
 
+# Affichage interactif des figures (SIR_SHOW=1) ; sinon elles sont seulement
+# sauvegardées, ce qui évite de bloquer les exécutions en lot
+AFFICHER_GRAPHIQUES = os.environ.get('SIR_SHOW', '0') == '1'
+
+
+def _equations_sir(y, t, beta, gamma, inv_N):
+    """Second membre du système SIR (inv_N = 1/N)"""
+    S, I, R = y
+    inf = beta * S * I * inv_N
+    return -inf, inf - gamma * I, gamma * I
+
+
+def _jacobien_sir(y, t, beta, gamma, inv_N):
+    """Jacobienne analytique du système SIR (inv_N = 1/N)"""
+    S, I, R = y
+    c = beta * inv_N
+    return [[-c * I, -c * S, 0.0],
+            [c * I, c * S - gamma, 0.0],
+            [0.0, gamma, 0.0]]
+
+
 class ModeleSIR:
     """Classe pour simuler le modèle SIR"""
     
@@ -32,11 +55,11 @@ class ModeleSIR:
         
     def equations_sir(self, y, t):
         """Système d'équations différentielles du modèle SIR"""
-        S, I, R = y
-        dSdt = -self.beta * S * I / self.N
-        dIdt = self.beta * S * I / self.N - self.gamma * I
-        dRdt = self.gamma * I
-        return dSdt, dIdt, dRdt
+        return _equations_sir(y, t, self.beta, self.gamma, 1.0 / self.N)
+    
+    def jacobien_sir(self, y, t):
+        """Jacobienne analytique du système SIR"""
+        return _jacobien_sir(y, t, self.beta, self.gamma, 1.0 / self.N)
     
     def simuler(self, temps):
         """
@@ -50,8 +73,12 @@ class ModeleSIR:
         ---------
         S, I, R : arrays - Solutions pour chaque compartiment
         """
+        # Paramètres passés par args (1/N calculé depuis self.N courant) :
+        # ni accès d'attributs ni division à chaque évaluation par odeint
         y0 = [self.S0, self.I0, self.R0_init]
-        solution = odeint(self.equations_sir, y0, temps)
+        solution = odeint(_equations_sir, y0, temps,
+                          args=(self.beta, self.gamma, 1.0 / self.N),
+                          Dfun=_jacobien_sir)
         S, I, R = solution.T
         return S, I, R
     
@@ -98,14 +125,16 @@ class ModeleSIR:
         plt.grid(True, alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig('resultats_sir.png', dpi=300, bbox_inches='tight')
+        plt.savefig('resultats_sir.png', dpi=150, bbox_inches='tight')
         print(" Graphique sauvegardé : resultats_sir.png")
-        plt.show()
+        if AFFICHER_GRAPHIQUES:
+            plt.show()
     
     def afficher_statistiques(self, temps, S, I, R):
         """Affiche les statistiques clés de la simulation"""
-        pic_infectes = np.max(I)
-        jour_pic = temps[np.argmax(I)]
+        idx_pic = np.argmax(I)
+        pic_infectes = I[idx_pic]
+        jour_pic = temps[idx_pic]
         total_infectes = self.N - S[-1]
         pourcentage_infectes = (total_infectes / self.N) * 100
         
@@ -140,7 +169,7 @@ def main():
     
     # Durée de la simulation
     jours = 200
-    temps = np.linspace(0, jours, jours)
+    temps = np.arange(0, jours+1, dtype=np.float64)  # un point par jour, jour 0 inclus
     
     # Créer et exécuter le modèle
     modele = ModeleSIR(N, beta, gamma, S0, I0, R0_init)